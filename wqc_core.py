@@ -0,0 +1,259 @@
+import streamlit as st
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import atexit
+import os
+import shelve
+import tempfile
+import threading
+import time
+from io import BytesIO
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from xml.sax.saxutils import escape
+
+__all__ = [
+    'CRITERIA_FLAT',
+    'TOTAL_ITEMS',
+    'SCREENING_KEYS',
+    'is_valid_url',
+    'url_netloc',
+    'get_website_info',
+    'calculate_rating',
+    'generate_results_text',
+    'generate_pdf',
+]
+
+# Define criteria categories as immutable (category, items) pairs
+CRITERIA = (
+    ("Purpose & E-E-A-T", (
+        "Clear beneficial purpose or main content",
+        "Appropriate E-E-A-T (Experience, Expertise, Authoritativeness, Trustworthiness)",
+        "Website is well-maintained and regularly updated"
+    )),
+    ("Content Quality", (
+        "High-quality main content",
+        "Accurate, factual information",
+        "Descriptive, helpful title"
+    )),
+    ("Website Reputation", (
+        "Positive reputation for website/creator",
+        "Satisfying amount of website information/contact info",
+        "Clear who is responsible for content"
+    )),
+    ("Design & Functionality", (
+        "Functional page design and layout",
+        "Mobile-friendly design",
+        "Ads (if present) don't interfere with main content"
+    )),
+    ("Security & Privacy", (
+        "Secure transaction handling (if applicable)",
+        "Clear privacy policy",
+        "Uses HTTPS for secure connection"
+    ))
+)
+
+# Flatten criteria into (category, item, checkbox key) once instead of per rerun
+CRITERIA_FLAT = tuple((category, item, f"{category}_{item}") for category, items in CRITERIA for item in items)
+TOTAL_ITEMS = len(CRITERIA_FLAT)
+
+# Session state keys of the initial screening radios
+SCREENING_KEYS = ('harmful_purpose', 'potential_harm', 'high_trust_needed')
+
+# Scheme and netloc of an http(s) URL
+_URL_RE = re.compile(r'^(https?)://([^/?#\s]+)')
+
+def is_valid_url(url):
+    return bool(_URL_RE.match(url))
+
+def url_netloc(url):
+    match = _URL_RE.match(url)
+    return match.group(2) if match else None
+
+# Share one pooled session across reruns and user sessions so repeat probes reuse keep-alive connections
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=20,
+        # Retry connection failures only; retrying read timeouts would stack 5s waits
+        max_retries=Retry(total=2, read=False, backoff_factor=0.1)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# How long a successful probe is reused, in seconds
+SITE_INFO_TTL = 300
+
+# Where successful probes are persisted; override with the WQC_STATE_DB environment variable
+STATE_DB_PATH = os.environ.get("WQC_STATE_DB", os.path.join(tempfile.gettempdir(), "wqc_state.db"))
+
+# Reuse successful probes across reruns and user sessions, persisted on disk so restarts can
+# skip the network too. The disk cache is best-effort: if the shelf can't be opened, probes
+# are kept in memory instead, and any shelf read or write error is treated as a cache miss.
+@st.cache_resource
+def _get_state_db():
+    try:
+        state_db = shelve.open(STATE_DB_PATH)
+    except Exception:
+        return shelve.Shelf({}), threading.Lock()
+    atexit.register(state_db.close)
+    # Drop entries that expired while the app wasn't running
+    try:
+        now = time.time()
+        for url in list(state_db.keys()):
+            if now - state_db[url][1] >= SITE_INFO_TTL:
+                del state_db[url]
+        state_db.sync()
+    except Exception:
+        pass
+    return state_db, threading.Lock()
+
+def _probe_website(url, session):
+    # Only headers, status and timing are used, so skip downloading the body
+    response = session.head(url, timeout=5, allow_redirects=True)
+    if response.status_code in (405, 501):
+        # Server doesn't support HEAD; fall back to GET without reading the body
+        response = session.get(url, timeout=5, stream=True)
+        response.close()
+    return {
+        'status_code': response.status_code,
+        'https': url.startswith('https'),
+        # Lowercase header names so lookups don't depend on the server's casing
+        'headers': {k.lower(): v for k, v in response.headers.items()},
+        'response_time': response.elapsed.total_seconds()
+    }
+
+def _read_cached_info(state_db, url):
+    try:
+        cached = state_db.get(url)
+        if cached is None:
+            return None
+        info, fetched_at = cached
+        if time.time() - fetched_at < SITE_INFO_TTL:
+            return info
+        del state_db[url]
+    except Exception:
+        pass
+    return None
+
+def _write_cached_info(state_db, url, info):
+    try:
+        state_db[url] = (info, time.time())
+        state_db.sync()
+    except Exception:
+        pass
+
+# Only successful probes are cached, so a failed check is retried on the next rerun
+def _get_site_info(url, session, state_db, state_db_lock):
+    with state_db_lock:
+        info = _read_cached_info(state_db, url)
+    if info is not None:
+        return True, info
+
+    try:
+        info = _probe_website(url, session)
+    except requests.RequestException as e:
+        return False, str(e)
+    with state_db_lock:
+        _write_cached_info(state_db, url, info)
+    return True, info
+
+def get_website_info(url):
+    return _get_site_info(url, get_http_session(), *_get_state_db())
+
+def get_website_infos(urls):
+    # Probe several websites concurrently; results keep the order of urls.
+    # Streamlit resources are resolved here because executor threads have no script context.
+    if not urls:
+        return []
+    session = get_http_session()
+    state_db, state_db_lock = _get_state_db()
+    with ThreadPoolExecutor(max_workers=min(len(urls), 20)) as executor:
+        return list(executor.map(lambda url: _get_site_info(url, session, state_db, state_db_lock), urls))
+
+# Minimum score percentage, rating and indicator, from highest to lowest
+_RATING_TABLE = (
+    (80, "Highest", "🟢"),
+    (60, "High", "🟢"),
+    (40, "Medium", "🟡"),
+    (20, "Low", "🟠"),
+    (0, "Lowest", "🔴"),
+)
+
+@lru_cache(maxsize=64)
+def calculate_rating(checked_count, total_items):
+    percentage = (checked_count / total_items) * 100
+    return next((rating, indicator) for threshold, rating, indicator in _RATING_TABLE if percentage >= threshold)
+
+def generate_results_text(results):
+    # Convert results into a text format for .txt download
+    return f"""
+    Website Quality Checker Results
+    ------------------------------
+    Evaluation Date: {results['Evaluation Date']}
+    Website URL: {results['Website URL']}
+    
+    Initial Screening Results:
+      - Harmful Purpose: {results['Initial Screening Results']['harmful_purpose']}
+      - Potential Harm: {results['Initial Screening Results']['potential_harm']}
+      - High Trust Needed: {results['Initial Screening Results']['high_trust_needed']}
+    
+    Quality Rating: {results['Quality Rating']}
+    Score: {results['Score']}
+    Criteria Met: {results['Criteria Met']}
+    
+    Evaluation Notes:
+    {results['Notes']}
+    
+    Checked Items:
+    {', '.join(results['Checked Items'].keys()) if results['Checked Items'] else "None"}
+    ------------------------------
+    """
+
+def generate_pdf(results):
+    pdf_buffer = BytesIO()
+    styles = getSampleStyleSheet()
+    body_style = ParagraphStyle("ExportBody", parent=styles["Normal"], fontName="Helvetica", fontSize=12, leading=15)
+    item_style = ParagraphStyle("ExportItem", parent=body_style, leftIndent=20)
+
+    def line(text, style=body_style):
+        return Paragraph(escape(str(text)), style)
+
+    screening = results['Initial Screening Results']
+    flowables = [
+        line("Website Quality Checker Results"),
+        line("-" * 50),
+        line(f"Evaluation Date: {results['Evaluation Date']}"),
+        line(f"Website URL: {results['Website URL']}"),
+        Spacer(1, 10),
+        line("Initial Screening Results:"),
+        line(f"- Harmful Purpose: {screening['harmful_purpose']}", item_style),
+        line(f"- Potential Harm: {screening['potential_harm']}", item_style),
+        line(f"- High Trust Needed: {screening['high_trust_needed']}", item_style),
+        Spacer(1, 10),
+        line(f"Quality Rating: {results['Quality Rating']}"),
+        line(f"Score: {results['Score']}"),
+        line(f"Criteria Met: {results['Criteria Met']}"),
+        Spacer(1, 10),
+        line("Evaluation Notes:"),
+        line(results["Notes"] if results["Notes"] else "None", item_style),
+        Spacer(1, 10),
+        line("Checked Items:"),
+    ]
+    if results["Checked Items"]:
+        flowables.extend(line(f"- {item}", item_style) for item in results["Checked Items"].keys())
+    else:
+        flowables.append(line("None", item_style))
+
+    # Lay out and paginate the whole document in one pass
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=50)
+    doc.build(flowables)
+    return pdf_buffer.getvalue()